@@ -1,33 +1,67 @@
 """Agent factory module."""
 
-from typing import Dict, Any, Optional, List, Union
-from pydantic import BaseModel, Field
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, Any, Optional, List, Union, ClassVar, Tuple, Hashable
 import uuid
 
+import pydantic_core
+
 from .agent_types import AgentConfig, AgentType, AgentMode
 from .agent import Agent
 
+def _freeze(value: Any) -> Hashable:
+    """Recursively convert dicts and lists into hashable equivalents."""
+    if isinstance(value, dict):
+        return frozenset((k, _freeze(v)) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, set):
+        return frozenset(_freeze(v) for v in value)
+    return value
+
+@dataclass(eq=False)
 class AgentFactory:
     """Agent factory class."""
     
-    _agent_types: Dict[str, type] = {}
+    _agent_types: ClassVar[Dict[str, type]] = {}
+    # Agents carry mutable state (history, status, errors), so reuse is opt-in
+    _agent_cache: ClassVar["OrderedDict[Tuple[Hashable, ...], Agent]"] = OrderedDict()
+    agent_cache_size: ClassVar[int] = 128
+    reuse_agents: ClassVar[bool] = False
     
-    def __init__(self, name: str = "", description: Optional[str] = None):
-        """Initialize agent factory."""
-        self.id = str(uuid.uuid4())
-        self.name = name
-        self.description = description
-        self.agents: Dict[str, Agent] = {}
-        self.metadata: Dict[str, Any] = {}
+    name: str = ""
+    description: Optional[str] = None
+    id: str = field(default_factory=lambda: str(uuid.uuid4()))
+    agents: Dict[str, Agent] = field(default_factory=dict)
+    metadata: Dict[str, Any] = field(default_factory=dict)
     
     @classmethod
     def register_agent(cls, agent_type: str, agent_class: type) -> None:
         """Register an agent type."""
         cls._agent_types[agent_type] = agent_class
+        cls.clear_cache()
     
     @classmethod
-    def create_agent(cls, config: Union[Dict[str, Any], AgentConfig]) -> Agent:
-        """Create an agent."""
+    def unregister_agent(cls, agent_type: str) -> None:
+        """Unregister an agent type."""
+        if cls._agent_types.pop(agent_type, None) is not None:
+            cls.clear_cache()
+    
+    @classmethod
+    def create_agent(
+        cls,
+        config: Union[Dict[str, Any], AgentConfig],
+        reuse: Optional[bool] = None
+    ) -> Agent:
+        """Create an agent.
+        
+        Args:
+            config: Agent configuration
+            reuse: Return a cached agent built from an identical configuration
+                instead of constructing a new one. Defaults to ``reuse_agents``.
+                Reused agents share their state with every other caller.
+        """
         if isinstance(config, dict):
             agent_type = config.get("AGENT", {}).get("type")
             if not agent_type:
@@ -44,7 +78,7 @@ class AgentFactory:
             agent_type_str = agent_type.value if isinstance(agent_type, AgentType) else agent_type
             if agent_type_str in cls._agent_types:
                 agent_class = cls._agent_types[agent_type_str]
-                return agent_class(config=config)
+                return cls._instantiate(agent_class, config, reuse)
             else:
                 raise ValueError(f"Agent type not registered: {agent_type_str}")
         elif isinstance(config, AgentConfig):
@@ -52,10 +86,53 @@ class AgentFactory:
             agent_type_str = agent_type.value if isinstance(agent_type, AgentType) else agent_type
             if agent_type_str in cls._agent_types:
                 agent_class = cls._agent_types[agent_type_str]
-                return agent_class(config=config)
+                return cls._instantiate(agent_class, config, reuse)
             else:
                 raise ValueError(f"Agent type not registered: {agent_type_str}")
         return Agent(config=config)
+    
+    @classmethod
+    def _instantiate(
+        cls,
+        agent_class: type,
+        config: Union[Dict[str, Any], AgentConfig],
+        reuse: Optional[bool]
+    ) -> Agent:
+        """Construct an agent, reusing a cached instance when allowed."""
+        if reuse is None:
+            reuse = cls.reuse_agents
+        if not reuse:
+            return agent_class(config=config)
+        
+        try:
+            key = (agent_class,) + cls._config_key(config)
+            agent = cls._agent_cache.get(key)
+        except TypeError:
+            # Configuration holds unhashable values, skip caching
+            return agent_class(config=config)
+        
+        if agent is None:
+            agent = agent_class(config=config)
+            cls._agent_cache[key] = agent
+            if len(cls._agent_cache) > cls.agent_cache_size:
+                cls._agent_cache.popitem(last=False)
+        else:
+            cls._agent_cache.move_to_end(key)
+        return agent
+    
+    @classmethod
+    def _config_key(cls, config: Union[Dict[str, Any], AgentConfig]) -> Tuple[Hashable, ...]:
+        """Build a hashable key from an agent configuration."""
+        if isinstance(config, AgentConfig):
+            # A defaulted id is a fresh uuid per instance and would never match
+            exclude = None if "id" in config.model_fields_set else {"id"}
+            config = config.model_dump(exclude=exclude)
+        return tuple(sorted((k, _freeze(v)) for k, v in config.items()))
+    
+    @classmethod
+    def clear_cache(cls) -> None:
+        """Drop all cached agent instances."""
+        cls._agent_cache.clear()
         
     def get_agent(self, agent_id: str) -> Optional[Agent]:
         """Get an agent."""
@@ -76,20 +153,51 @@ class AgentFactory:
             "id": self.id,
             "name": self.name,
             "description": self.description,
-            "agents": {k: v.to_dict() for k, v in self.agents.items()},
+            # process_message is a callable and cannot be serialized
+            "agents": {
+                k: v.model_dump(mode="json", exclude={"process_message"})
+                for k, v in self.agents.items()
+            },
             "metadata": self.metadata
         }
         
+    def to_json(self) -> bytes:
+        """Serialize to JSON bytes."""
+        return pydantic_core.to_json(self.to_dict())
+        
     @classmethod
-    def from_dict(cls, data: Dict[str, Any]) -> "AgentFactory":
-        """Create from dictionary."""
-        factory = cls(name=data.get("name", ""), description=data.get("description"))
-        factory.id = data.get("id", str(uuid.uuid4()))
-        factory.metadata = data.get("metadata", {})
+    def from_json(cls, data: Union[str, bytes], validate: bool = True) -> "AgentFactory":
+        """Create from JSON produced by ``to_json``."""
+        return cls.from_dict(pydantic_core.from_json(data), validate=validate)
         
-        # Load agents
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], validate: bool = True) -> "AgentFactory":
+        """Create from dictionary.
+        
+        Args:
+            data: Serialized factory, as produced by ``to_dict``
+            validate: Check field types before constructing. Pass ``False``
+                on hot paths where the data is already known to be well formed.
+        """
+        if validate:
+            if not isinstance(data.get("name", ""), str):
+                raise ValueError("Factory name must be a string")
+            if not isinstance(data.get("metadata", {}), dict):
+                raise ValueError("Factory metadata must be a dictionary")
+            if not isinstance(data.get("agents", {}), dict):
+                raise ValueError("Factory agents must be a dictionary")
+        
+        # Load agents; registered subclasses are restored as plain agents
+        agents = {}
         for agent_id, agent_data in data.get("agents", {}).items():
-            agent = Agent.from_dict(agent_data)
-            factory.agents[agent_id] = agent
-            
-        return factory
+            agent_data = dict(agent_data)
+            config = agent_data.pop("config", None) or {}
+            agents[agent_id] = Agent(config=config, **agent_data)
+        
+        return cls(
+            name=data.get("name", ""),
+            description=data.get("description"),
+            id=data.get("id") or str(uuid.uuid4()),
+            agents=agents,
+            metadata=data.get("metadata", {})
+        )
@@ -4,8 +4,6 @@ from typing import Dict, Any, List, Set
 import logging
 from dataclasses import dataclass
 import numpy as np
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
 from .adaptive_weights import AdaptiveWeights, WeightConfig
 from .isa.isa_manager import Instruction
 
@@ -25,6 +23,9 @@ class InstructionSelector:
     """Intelligent instruction selection and optimization"""
     
     def __init__(self):
+        # sklearn is imported on first use so importing agentflow stays cheap
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        
         self.vectorizer = TfidfVectorizer()
         # Fit with a dummy document to ensure it's always fitted
         self.vectorizer.fit(["dummy document"])
@@ -119,6 +120,8 @@ class InstructionSelector:
     
     def _calculate_relevance(self, query: str, instruction_desc: str) -> float:
         """Calculate semantic relevance between query and instruction"""
+        from sklearn.metrics.pairwise import cosine_similarity
+        
         query_vector = self.vectorizer.transform([query])
         instruction_vector = self.vectorizer.transform([instruction_desc])
         return float(cosine_similarity(query_vector, instruction_vector)[0][0])
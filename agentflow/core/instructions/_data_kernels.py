@@ -0,0 +1,101 @@
+"""Numeric kernels for DataProcessingInstruction.
+
+The kernels are plain Python loops over contiguous float32 matrices so they
+can be compiled either just-in-time with ``numba.njit`` or ahead-of-time with
+``numba.pycc`` into the ``_data_kernels_aot`` submodule next to this file.
+The AOT module is only built when numba is importable while
+``setup.py`` runs. pip's default isolated build environment does not contain
+numba, so a plain ``pip install`` skips it and the kernels are JIT-compiled
+at runtime instead. To build it, install numba first and then either run
+``pip install --no-build-isolation .`` or::
+
+    python agentflow/core/instructions/_data_kernels.py
+"""
+
+import os
+
+import numpy as np
+
+try:
+    from numba import prange
+except ImportError:
+    prange = range
+
+# Explicit signatures keep the JIT from recompiling per call and are
+# required for AOT export
+SIGNATURES = {
+    "standardize": "f4[:, :](f4[:, :], f4[:], f4[:])",
+    "project": "f4[:, :](f4[:, :], f4[:], f4[:, :])",
+    "fused_preprocess_reduce_cluster": "void(f4[:, :], f4[:], f4[:], f4[:, :], f4[:, :], i8[:], f4[:, :])",
+}
+
+def standardize(x, mean, std):
+    """Standardize each column of ``x`` with the given mean and scale."""
+    n_samples, n_features = x.shape
+    out = np.empty((n_samples, n_features), dtype=np.float32)
+    for i in prange(n_samples):
+        for j in range(n_features):
+            out[i, j] = (x[i, j] - mean[j]) / std[j]
+    return out
+
+def project(x, mean, components):
+    """Project centered rows of ``x`` onto the principal components."""
+    n_samples, n_features = x.shape
+    n_components = components.shape[0]
+    out = np.empty((n_samples, n_components), dtype=np.float32)
+    for i in prange(n_samples):
+        for k in range(n_components):
+            acc = np.float32(0.0)
+            for j in range(n_features):
+                acc += (x[i, j] - mean[j]) * components[k, j]
+            out[i, k] = acc
+    return out
+
+def fused_preprocess_reduce_cluster(x, mean, std, components, centroids, out_labels, out_reduced):
+    """Standardize, project and assign each row in a single pass.
+    
+    Only the projected rows and their labels are written; the standardized
+    matrix is never materialized.
+    """
+    n_samples, n_features = x.shape
+    n_components = components.shape[0]
+    n_clusters = centroids.shape[0]
+    for i in prange(n_samples):
+        for k in range(n_components):
+            acc = np.float32(0.0)
+            for j in range(n_features):
+                acc += (x[i, j] - mean[j]) / std[j] * components[k, j]
+            out_reduced[i, k] = acc
+        best = 0
+        best_dist = np.float32(0.0)
+        for c in range(n_clusters):
+            dist = np.float32(0.0)
+            for k in range(n_components):
+                diff = out_reduced[i, k] - centroids[c, k]
+                dist += diff * diff
+            if c == 0 or dist < best_dist:
+                best_dist = dist
+                best = c
+        out_labels[i] = best
+
+def build():
+    """Return the ``numba.pycc`` module exporting every kernel.
+    
+    Only called at build time; ``numba.pycc`` is deprecated and warns on import.
+    The extension is named after this module's package, so it must be loaded
+    as ``agentflow.core.instructions._data_kernels`` for ``setup.py``.
+    """
+    from numba.pycc import CC
+    
+    cc = CC("_data_kernels_aot")
+    cc.output_dir = os.path.dirname(os.path.abspath(__file__))
+    for name, signature in SIGNATURES.items():
+        cc.export(name, signature)(globals()[name])
+    return cc
+
+if __name__ == "__main__":
+    try:
+        cc = build()
+    except ImportError:
+        raise SystemExit("numba is required to build the data kernels")
+    cc.compile()
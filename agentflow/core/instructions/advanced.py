@@ -10,6 +10,11 @@ import gc
 import pandas as pd
 import numpy as np
 
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
 logger = logging.getLogger(__name__)
 
 class AdvancedInstruction(BaseInstruction):
@@ -319,8 +324,89 @@ class AdaptiveInstruction(AdvancedInstruction):
         
         return adapted_context
 
+# Numeric kernels for DataProcessingInstruction. Prefer the ahead-of-time
+# compiled extension, then JIT-compile the same kernels with numba, and fall
+# back to vectorized NumPy when numba is not installed.
+try:
+    from ._data_kernels_aot import (
+        standardize as _standardize,
+        project as _project,
+        fused_preprocess_reduce_cluster as _fused_preprocess_reduce_cluster
+    )
+except ImportError:
+    if njit is not None:
+        from . import _data_kernels
+        
+        def _jit(name: str) -> Callable:
+            """JIT-compile a kernel from ``_data_kernels``."""
+            return njit(
+                _data_kernels.SIGNATURES[name], cache=True, fastmath=True, parallel=True
+            )(getattr(_data_kernels, name))
+        
+        _standardize = _jit("standardize")
+        _project = _jit("project")
+        _fused_kernel = None
+        
+        def _fused_preprocess_reduce_cluster(x, mean, std, components, centroids, out_labels, out_reduced):
+            """Run the fused kernel, compiling it on first use.
+            
+            Fusion is opt-in, so the parallel kernel is not compiled on import.
+            """
+            global _fused_kernel
+            if _fused_kernel is None:
+                _fused_kernel = _jit("fused_preprocess_reduce_cluster")
+            _fused_kernel(x, mean, std, components, centroids, out_labels, out_reduced)
+    else:
+        def _standardize(x, mean, std):
+            """Standardize each column of ``x`` with the given mean and scale."""
+            return ((x - mean) / std).astype(np.float32, copy=False)
+        
+        def _project(x, mean, components):
+            """Project centered rows of ``x`` onto the principal components."""
+            return ((x - mean) @ components.T).astype(np.float32, copy=False)
+        
+        def _fused_preprocess_reduce_cluster(x, mean, std, components, centroids, out_labels, out_reduced):
+            """Standardize, project and assign each row in a single pass."""
+            np.matmul((x - mean) / std, components.T, out=out_reduced)
+            out_labels[:] = _nearest_centroids(out_reduced, centroids)
+
+# Above this many clusters, assignment uses scipy's cdist instead of a
+# single GEMM
+_GEMM_MAX_CLUSTERS = 64
+
+def _nearest_centroids(x: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    """Assign each row of ``x`` to its nearest centroid in one batched call.
+    
+    ``||x - c||^2`` is expanded as ``||x||^2 - 2 x.c + ||c||^2``; the
+    ``||x||^2`` term does not change the argmin and is dropped.
+    """
+    if centroids.shape[0] <= _GEMM_MAX_CLUSTERS:
+        dists = -2.0 * (x @ centroids.T) + (centroids * centroids).sum(axis=1)
+    else:
+        from scipy.spatial.distance import cdist
+        dists = cdist(x, centroids, "sqeuclidean")
+    return dists.argmin(axis=1).astype(np.int64)
+
+def _as_float32(data: Any) -> np.ndarray:
+    """Return ``data`` as a C-contiguous float32 matrix."""
+    values = data.values if isinstance(data, pd.DataFrame) else data
+    return np.ascontiguousarray(values, dtype=np.float32)
+
 class DataProcessingInstruction(AdvancedInstruction):
-    """Instruction for data processing tasks."""
+    """Instruction for data processing tasks.
+    
+    Clustering runs Lloyd's algorithm on the projected rows. ``clusterer``
+    only supplies its parameters (``n_clusters``, ``random_state``, ``tol``,
+    ``max_iter``) and is never fitted; the fitted centers are stored in
+    ``cluster_centers_``.
+    
+    Setting ``fuse_stages = True`` opts into a single-pass fused pipeline for
+    runs without custom steps. It returns the same keys as the staged path,
+    but ``processed_data`` is ``None`` (unless the context sets
+    ``return_processed_data``, which falls back to the staged path), ``pca``
+    is left unfitted, and components come from an eigendecomposition of the
+    covariance rather than sklearn's PCA.
+    """
     
     def __init__(self, name: str, description: str):
         super().__init__(name, description)
@@ -335,6 +421,13 @@ class DataProcessingInstruction(AdvancedInstruction):
         self.scaler = StandardScaler()
         self.pca = PCA(n_components=2)
         self.clusterer = KMeans(n_clusters=2, random_state=42)
+        # Centers from the last clustering run, set by _lloyd
+        self.cluster_centers_ = None
+        
+        # Opt-in: run standardize -> project -> assign as one fused pass
+        # when no custom steps need the intermediate results
+        self.fuse_stages = False
+        self.seed_sample_size = 256
         
     def add_preprocessing_step(self, step: Callable):
         """Add a preprocessing step."""
@@ -344,40 +437,143 @@ class DataProcessingInstruction(AdvancedInstruction):
         """Add an analysis step."""
         self.analysis_steps.append(step)
         
-    async def _preprocess(self, data: Any) -> Any:
-        """Preprocess the data."""
+    def _preprocess(self, data: Any) -> Any:
+        """Standardize the data."""
         try:
             processed_data = data
             # Apply standard scaling
-            if isinstance(processed_data, pd.DataFrame):
-                scaled_data = self.scaler.fit_transform(processed_data)
-                processed_data = pd.DataFrame(scaled_data, columns=data.columns, index=data.index)
-            elif isinstance(processed_data, np.ndarray):
-                processed_data = self.scaler.fit_transform(processed_data)
-            
-            # Apply custom preprocessing steps
+            if isinstance(processed_data, (pd.DataFrame, np.ndarray)):
+                values = _as_float32(processed_data)
+                self.scaler.fit(values)
+                scaled_data = _standardize(
+                    values,
+                    self.scaler.mean_.astype(np.float32),
+                    self.scaler.scale_.astype(np.float32)
+                )
+                if isinstance(processed_data, pd.DataFrame):
+                    processed_data = pd.DataFrame(scaled_data, columns=data.columns, index=data.index)
+                else:
+                    processed_data = scaled_data
+            return processed_data
+        except Exception as e:
+            raise Exception(f"Error in preprocessing: {str(e)}")
+    
+    async def _apply_preprocessing_steps(self, data: Any) -> Any:
+        """Apply custom preprocessing steps."""
+        try:
+            processed_data = data
             for step in self.preprocessing_steps:
                 processed_data = await step(processed_data)
             return processed_data
         except Exception as e:
             raise Exception(f"Error in preprocessing: {str(e)}")
             
-    async def _reduce_dimensions(self, data: Any) -> Any:
+    def _reduce_dimensions(self, data: Any) -> Any:
         """Reduce dimensions using PCA."""
         try:
-            reduced_data = self.pca.fit_transform(data)
+            values = _as_float32(data)
+            self.pca.fit(values)
+            reduced_data = _project(
+                values,
+                self.pca.mean_.astype(np.float32),
+                np.ascontiguousarray(self.pca.components_, dtype=np.float32)
+            )
             if isinstance(data, pd.DataFrame):
                 return pd.DataFrame(reduced_data, columns=[f"PC{i+1}" for i in range(reduced_data.shape[1])], index=data.index)
             return reduced_data
         except Exception as e:
             raise Exception(f"Error in dimension reduction: {str(e)}")
             
-    async def _cluster(self, data: Any) -> np.ndarray:
-        """Perform clustering."""
+    def _cluster(self, data: Any) -> np.ndarray:
+        """Perform k-means clustering with Lloyd's algorithm."""
         try:
-            return self.clusterer.fit_predict(data)
+            from sklearn.cluster import kmeans_plusplus
+            
+            values = _as_float32(data)
+            centroids, _ = kmeans_plusplus(
+                values,
+                n_clusters=self.clusterer.n_clusters,
+                random_state=self.clusterer.random_state
+            )
+            centroids = np.ascontiguousarray(centroids, dtype=np.float32)
+            labels = _nearest_centroids(values, centroids)
+            return self._lloyd(values, centroids, labels)
         except Exception as e:
             raise Exception(f"Error in clustering: {str(e)}")
+    
+    def _lloyd(self, values: np.ndarray, centroids: np.ndarray, labels: np.ndarray) -> np.ndarray:
+        """Refine an initial assignment with Lloyd iterations."""
+        n_clusters = centroids.shape[0]
+        tol = self.clusterer.tol * float(np.mean(np.var(values, axis=0)))
+        
+        for _ in range(self.clusterer.max_iter):
+            counts = np.bincount(labels, minlength=n_clusters)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, labels, values)
+            # Keep the previous centroid for clusters that lost all members
+            empty = counts == 0
+            new_centroids = np.where(
+                empty[:, None], centroids, sums / np.maximum(counts, 1)[:, None]
+            ).astype(np.float32)
+            shift = float(((new_centroids - centroids) ** 2).sum())
+            centroids = new_centroids
+            labels = _nearest_centroids(values, centroids)
+            if shift <= tol:
+                break
+        
+        self.cluster_centers_ = centroids
+        return labels
+    
+    def _can_fuse(self, context: Dict[str, Any]) -> bool:
+        """Check whether the fused pipeline can replace the staged one."""
+        return (
+            self.fuse_stages
+            and not self.preprocessing_steps
+            and not self.analysis_steps
+            and not context.get("return_processed_data", False)
+        )
+    
+    def _fit_components(self, values: np.ndarray, std: np.ndarray) -> tuple:
+        """Fit principal components of the standardized data.
+        
+        The covariance of the standardized matrix is derived from the raw
+        covariance, so the standardized matrix itself is never built.
+        """
+        n_components = self.pca.n_components
+        if n_components > values.shape[1]:
+            raise ValueError(
+                f"n_components={n_components} must be <= n_features={values.shape[1]}"
+            )
+        scale = std.astype(np.float64)
+        cov = np.atleast_2d(np.cov(values, rowvar=False)) / np.outer(scale, scale)
+        eigvals, eigvecs = np.linalg.eigh(cov)
+        order = np.argsort(eigvals)[::-1][:n_components]
+        components = np.ascontiguousarray(eigvecs[:, order].T, dtype=np.float32)
+        explained_variance = eigvals[order] / eigvals.sum()
+        return components, explained_variance
+    
+    def _seed_centroids(self, values: np.ndarray, mean: np.ndarray, std: np.ndarray,
+                        components: np.ndarray) -> np.ndarray:
+        """Pick k-means++ seeds from a projected subsample of the data."""
+        from sklearn.cluster import kmeans_plusplus
+        
+        n_samples = len(values)
+        sample = values
+        if n_samples > self.seed_sample_size:
+            rng = np.random.default_rng(self.clusterer.random_state)
+            rows = np.sort(rng.choice(n_samples, self.seed_sample_size, replace=False))
+            sample = np.ascontiguousarray(values[rows])
+        projected = _project(
+            _standardize(sample, mean, std),
+            np.zeros(values.shape[1], dtype=np.float32),
+            components
+        )
+        centroids, _ = kmeans_plusplus(
+            projected,
+            n_clusters=self.clusterer.n_clusters,
+            random_state=self.clusterer.random_state
+        )
+        return np.ascontiguousarray(centroids, dtype=np.float32)
             
     async def _analyze(self, data: Any) -> Dict[str, Any]:
         """Analyze the data."""
@@ -385,12 +581,12 @@ class DataProcessingInstruction(AdvancedInstruction):
             results = {}
             
             # Apply dimension reduction
-            reduced_data = await self._reduce_dimensions(data)
+            reduced_data = self._reduce_dimensions(data)
             results["reduced_data"] = reduced_data
             results["explained_variance"] = self.pca.explained_variance_ratio_
             
             # Apply clustering
-            clusters = await self._cluster(reduced_data)
+            clusters = self._cluster(reduced_data)
             results["clusters"] = clusters
             
             # Apply custom analysis steps
@@ -411,8 +607,13 @@ class DataProcessingInstruction(AdvancedInstruction):
             if not isinstance(data, (pd.DataFrame, np.ndarray)):
                 raise ValueError("Invalid data type. Expected DataFrame or ndarray")
                 
+            if self._can_fuse(context):
+                return self._execute_fused(data)
+                
             # Process data
-            processed_data = await self._preprocess(data)
+            processed_data = self._preprocess(data)
+            if self.preprocessing_steps:
+                processed_data = await self._apply_preprocessing_steps(processed_data)
             
             # Analyze data
             analysis_results = await self._analyze(processed_data)
@@ -436,6 +637,61 @@ class DataProcessingInstruction(AdvancedInstruction):
             }
         except Exception as e:
             raise e
+    
+    def _execute_fused(self, data: Any) -> Dict[str, Any]:
+        """Run the whole pipeline through the fused kernel.
+        
+        The standardized matrix is not kept, so ``processed_data`` is ``None``;
+        pass ``return_processed_data=True`` in the context to get it.
+        """
+        values = _as_float32(data)
+        n_samples = values.shape[0]
+        n_components = self.pca.n_components
+        
+        # Pre-allocate the only buffers the pipeline writes
+        out_reduced = np.empty((n_samples, n_components), dtype=np.float32)
+        out_labels = np.empty(n_samples, dtype=np.int64)
+        
+        self.scaler.fit(values)
+        mean = self.scaler.mean_.astype(np.float32)
+        std = self.scaler.scale_.astype(np.float32)
+        components, explained_variance = self._fit_components(values, std)
+        centroids = self._seed_centroids(values, mean, std, components)
+        
+        _fused_preprocess_reduce_cluster(
+            values, mean, std, components, centroids, out_labels, out_reduced
+        )
+        clusters = self._lloyd(out_reduced, centroids, out_labels)
+        
+        reduced_data = out_reduced
+        if isinstance(data, pd.DataFrame):
+            reduced_data = pd.DataFrame(
+                out_reduced,
+                columns=[f"PC{i+1}" for i in range(n_components)],
+                index=data.index
+            )
+        
+        analysis_results = {
+            "reduced_data": reduced_data,
+            "explained_variance": explained_variance,
+            "clusters": clusters
+        }
+        metrics = {
+            "n_samples": n_samples,
+            "n_features": values.shape[1],
+            "n_components": n_components,
+            "explained_variance": list(explained_variance),
+            "processing_steps": 0,
+            "analysis_steps": 0
+        }
+        
+        return {
+            "processed_data": None,
+            "reduced_data": reduced_data,
+            "clusters": clusters,
+            "analysis_results": analysis_results,
+            "metrics": metrics
+        }
 
 class ResourceManagerInstruction(AdvancedInstruction):
     """Instruction for managing system resources."""
@@ -1,17 +1,25 @@
 """Advanced transformation strategies for data processing."""
+import re
 import numpy as np
 import pandas as pd
 import logging
+from functools import lru_cache
 from typing import Any, Dict, List, Optional, Union
-from sklearn.preprocessing import StandardScaler, PolynomialFeatures
-from sklearn.covariance import EllipticEnvelope
-from nltk.tokenize import word_tokenize
-from nltk.corpus import stopwords
-from nltk.stem import WordNetLemmatizer
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.ensemble import IsolationForest
-from sklearn.neighbors import LocalOutlierFactor
-from sklearn.svm import OneClassSVM
+
+# nltk is imported on first use: its package import also loads sklearn
+@lru_cache(maxsize=None)
+def _english_stopwords() -> frozenset:
+    """Load the English stopword list once per process."""
+    from nltk.corpus import stopwords
+    
+    return frozenset(stopwords.words('english'))
+
+@lru_cache(maxsize=None)
+def _lemmatizer() -> Any:
+    """Create the shared WordNet lemmatizer once per process."""
+    from nltk.stem import WordNetLemmatizer
+    
+    return WordNetLemmatizer()
 
 class AdvancedTransformationStrategy:
     """Base class for advanced transformation strategies."""
@@ -78,20 +86,32 @@ class OutlierRemovalStrategy(AdvancedTransformationStrategy):
         if numeric_data.empty:
             return data if not is_numpy else data.values
         
-        if self.method == 'z_score':
-            z_scores = np.abs(StandardScaler().fit_transform(numeric_data))
-            mask = (z_scores < self.threshold).all(axis=1)
-        elif self.method == 'iqr':
-            Q1 = numeric_data.quantile(0.25)
-            Q3 = numeric_data.quantile(0.75)
-            IQR = Q3 - Q1
-            mask = ~((numeric_data < (Q1 - self.threshold * IQR)) | (numeric_data > (Q3 + self.threshold * IQR))).any(axis=1)
-        elif self.method == 'modified_z_score':
-            median = numeric_data.median()
-            mad = (numeric_data - median).abs().median()
-            modified_z_scores = 0.6745 * (numeric_data - median) / mad
-            mask = (np.abs(modified_z_scores) < self.threshold).all(axis=1)
+        if self.method in ('z_score', 'iqr', 'modified_z_score'):
+            # One pass over a single float array; NaN-aware reductions only when needed
+            # Nullable Int64/Float64 columns hold pd.NA, which float64 can't take
+            values = numeric_data.to_numpy(dtype=np.float64, copy=False, na_value=np.nan)
+            has_nan = np.isnan(values).any()
+            with np.errstate(divide='ignore', invalid='ignore'):
+                if self.method == 'z_score':
+                    mean = np.nanmean(values, axis=0) if has_nan else values.mean(axis=0)
+                    std = np.nanstd(values, axis=0) if has_nan else values.std(axis=0)
+                    std[std == 0] = 1.0  # same as StandardScaler for constant columns
+                    mask = (np.abs(values - mean) / std < self.threshold).all(axis=1)
+                elif self.method == 'iqr':
+                    percentile = np.nanpercentile if has_nan else np.percentile
+                    Q1, Q3 = percentile(values, [25, 75], axis=0)
+                    IQR = Q3 - Q1
+                    mask = ~((values < Q1 - self.threshold * IQR) | (values > Q3 + self.threshold * IQR)).any(axis=1)
+                else:
+                    median_fn = np.nanmedian if has_nan else np.median
+                    deviations = values - median_fn(values, axis=0)
+                    mad = median_fn(np.abs(deviations), axis=0)
+                    modified_z_scores = 0.6745 * deviations / mad
+                    mask = (np.abs(modified_z_scores) < self.threshold).all(axis=1)
         elif self.method == 'isolation_forest':
+            # sklearn estimators are imported on first use to keep module import cheap
+            from sklearn.ensemble import IsolationForest
+            
             contamination = self.params.get('contamination', 0.1)
             random_state = self.params.get('random_state', None)
             detector = IsolationForest(contamination=contamination, random_state=random_state)
@@ -147,20 +167,25 @@ class FeatureEngineeringStrategy(AdvancedTransformationStrategy):
             # If no numeric columns, return original data
             return data
         
+        # Hand sklearn one contiguous float64 block instead of a DataFrame
+        values = numeric_data.to_numpy(dtype=np.float64, na_value=np.nan)
+        
         if self.strategy == 'standard':
+            from sklearn.preprocessing import StandardScaler
+            
             scaler = StandardScaler()
-            transformed_data = scaler.fit_transform(numeric_data)
-            transformed_df = pd.DataFrame(transformed_data, columns=numeric_data.columns, index=data.index)
+            transformed_data = scaler.fit_transform(values)
             
             # Replace numeric columns with transformed data
             result = data.copy()
-            for col in numeric_data.columns:
-                result[col] = transformed_df[col]
+            result[numeric_data.columns] = transformed_data
             return result
             
         elif self.strategy == 'polynomial':
+            from sklearn.preprocessing import PolynomialFeatures
+            
             poly = PolynomialFeatures(degree=self.params.get('degree', 2))
-            transformed_data = poly.fit_transform(numeric_data)
+            transformed_data = poly.fit_transform(values)
             feature_names = [f'poly_{i}' for i in range(transformed_data.shape[1])]
             transformed_df = pd.DataFrame(transformed_data, columns=feature_names, index=data.index)
             
@@ -178,6 +203,9 @@ class FeatureEngineeringStrategy(AdvancedTransformationStrategy):
 class TextTransformationStrategy(AdvancedTransformationStrategy):
     """Strategy for text data transformations."""
     
+    # Compiled once for every instance; strips everything but word characters and whitespace
+    _PUNCT_RE = re.compile(r'[^\w\s]', re.UNICODE)
+    
     def __init__(self, method: str = 'normalize', **kwargs):
         """Initialize text transformation strategy."""
         super().__init__(**kwargs)
@@ -187,24 +215,28 @@ class TextTransformationStrategy(AdvancedTransformationStrategy):
         self.vectorize = kwargs.get('vectorize', False)
         self.max_features = kwargs.get('max_features', 100)
     
-    def transform(self, data: Union[pd.DataFrame, np.ndarray]) -> Union[pd.DataFrame, np.ndarray]:
+    def transform(self, data: Union[pd.DataFrame, np.ndarray, List[List[str]]]) -> Union[pd.DataFrame, np.ndarray]:
         """Transform text data.
         
         Args:
-            data: Input data (DataFrame or ndarray)
+            data: Input data (DataFrame, ndarray, or a list of pre-tokenized documents)
             
         Returns:
             Transformed data with processed text
         """
         self.logger.info(f"Applying {self.method} text transformation")
         
+        # Pre-tokenized documents skip the string splitting entirely
+        if isinstance(data, list) and data and isinstance(data[0], list):
+            return self._transform_tokens(data)
+        
         # Convert numpy array to DataFrame if needed
         is_numpy = isinstance(data, np.ndarray)
         if is_numpy:
             data = pd.DataFrame(data)
         
         # Get text columns only
-        text_cols = data.select_dtypes(include=['object']).columns
+        text_cols = data.select_dtypes(include=['object', 'category']).columns
         if len(text_cols) == 0:
             return data if not is_numpy else data.values
         
@@ -214,31 +246,59 @@ class TextTransformationStrategy(AdvancedTransformationStrategy):
             if self.method == 'normalize':
                 # Basic text cleaning
                 result[col] = result[col].str.lower()
-                result[col] = result[col].str.replace(r'[^\w\s]', '', regex=True)
-                
-                if self.remove_stopwords:
-                    stop_words = set(stopwords.words('english'))
-                    result[col] = result[col].apply(lambda x: ' '.join([word for word in str(x).split() if word not in stop_words]))
+                result[col] = result[col].str.replace(self._PUNCT_RE, '', regex=True)
                 
-                if self.lemmatize:
-                    lemmatizer = WordNetLemmatizer()
-                    result[col] = result[col].apply(lambda x: ' '.join([lemmatizer.lemmatize(word) for word in str(x).split()]))
+                if self.remove_stopwords or self.lemmatize:
+                    result[col] = result[col].apply(lambda x: ' '.join(self._filter_tokens(str(x).split())))
                 
                 # Add word count feature
                 result[f'{col}_word_count'] = result[col].str.split().str.len()
                 
                 if self.vectorize:
-                    # Add TF-IDF features
-                    vectorizer = TfidfVectorizer(max_features=self.max_features)
-                    tfidf_matrix = vectorizer.fit_transform(result[col].fillna(''))
-                    feature_names = [f'{col}_tfidf_{i}' for i in range(tfidf_matrix.shape[1])]
-                    tfidf_df = pd.DataFrame(tfidf_matrix.toarray(), columns=feature_names, index=data.index)
-                    result = pd.concat([result, tfidf_df], axis=1)
+                    result = self._add_tfidf(result, col)
             
             else:
                 raise ValueError(f"Unknown text transformation method: {self.method}")
         
         return result if not is_numpy else result.values
+    
+    def _transform_tokens(self, documents: List[List[str]]) -> pd.DataFrame:
+        """Normalize pre-tokenized documents into the same layout as a 'text' column."""
+        if self.method != 'normalize':
+            raise ValueError(f"Unknown text transformation method: {self.method}")
+        
+        normalized = []
+        for tokens in documents:
+            cleaned = [self._PUNCT_RE.sub('', token.lower()) for token in tokens]
+            normalized.append(self._filter_tokens([token for token in cleaned if token]))
+        
+        result = pd.DataFrame({
+            'text': [' '.join(tokens) for tokens in normalized],
+            'text_word_count': [len(tokens) for tokens in normalized]
+        })
+        if self.vectorize:
+            result = self._add_tfidf(result, 'text')
+        return result
+    
+    def _filter_tokens(self, tokens: List[str]) -> List[str]:
+        """Drop stopwords and lemmatize tokens according to the strategy options."""
+        if self.remove_stopwords:
+            stop_words = _english_stopwords()
+            tokens = [word for word in tokens if word not in stop_words]
+        if self.lemmatize:
+            lemmatizer = _lemmatizer()
+            tokens = [lemmatizer.lemmatize(word) for word in tokens]
+        return tokens
+    
+    def _add_tfidf(self, result: pd.DataFrame, col: str) -> pd.DataFrame:
+        """Append TF-IDF features for a normalized text column."""
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        
+        vectorizer = TfidfVectorizer(max_features=self.max_features)
+        tfidf_matrix = vectorizer.fit_transform(result[col].fillna(''))
+        feature_names = [f'{col}_tfidf_{i}' for i in range(tfidf_matrix.shape[1])]
+        tfidf_df = pd.DataFrame(tfidf_matrix.toarray(), columns=feature_names, index=result.index)
+        return pd.concat([result, tfidf_df], axis=1)
 
 class AnomalyDetectionStrategy(AdvancedTransformationStrategy):
     """Strategy for detecting anomalies in data."""
@@ -266,7 +326,10 @@ class AnomalyDetectionStrategy(AdvancedTransformationStrategy):
         
         result = data.copy()
         
+        # sklearn estimators are imported on first use to keep module import cheap
         if self.strategy == 'isolation_forest':
+            from sklearn.ensemble import IsolationForest
+            
             contamination = self.params.get('contamination', 0.1)
             random_state = self.params.get('random_state', None)
             detector = IsolationForest(contamination=contamination, random_state=random_state)
@@ -275,6 +338,8 @@ class AnomalyDetectionStrategy(AdvancedTransformationStrategy):
             return result
         
         elif self.strategy == 'local_outlier_factor':
+            from sklearn.neighbors import LocalOutlierFactor
+            
             n_neighbors = self.params.get('n_neighbors', 20)
             contamination = self.params.get('contamination', 0.1)
             detector = LocalOutlierFactor(n_neighbors=n_neighbors, contamination=contamination)
@@ -283,6 +348,8 @@ class AnomalyDetectionStrategy(AdvancedTransformationStrategy):
             return result
         
         elif self.strategy == 'one_class_svm':
+            from sklearn.svm import OneClassSVM
+            
             kernel = self.params.get('kernel', 'rbf')
             nu = self.params.get('nu', 0.1)
             detector = OneClassSVM(kernel=kernel, nu=nu)
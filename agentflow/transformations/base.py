@@ -1,9 +1,13 @@
 """Base classes for transformations."""
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
 from dataclasses import dataclass
 import abc
+import sys
 
-@dataclass
+# dataclass(slots=True) is only available from Python 3.10
+_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+@dataclass(frozen=True, **_SLOTS)
 class TransformationResult:
     """Result of a transformation operation."""
     success: bool
@@ -14,6 +18,8 @@ class TransformationResult:
 class TransformationBase(abc.ABC):
     """Base class for all transformations."""
     
+    __slots__ = ('config',)
+    
     def __init__(self, config: Dict[str, Any]):
         """Initialize transformation."""
         self.config = config
@@ -26,6 +32,8 @@ class TransformationBase(abc.ABC):
 class TransformationStrategy(TransformationBase):
     """Base class for transformation strategies."""
     
+    __slots__ = ('name', 'description', 'version')
+    
     def __init__(self, config: Dict[str, Any]):
         """Initialize transformation strategy."""
         super().__init__(config)
@@ -33,6 +41,10 @@ class TransformationStrategy(TransformationBase):
         self.description = config.get('description', '')
         self.version = config.get('version', '1.0.0')
         
+    def identity(self) -> Tuple[str, str, str]:
+        """Get strategy name, description and version in one call."""
+        return (self.name, self.description, self.version)
+        
     def get_name(self) -> str:
         """Get strategy name."""
         return self.name
@@ -1,12 +1,15 @@
 """Specialized transformation strategies for specific data types."""
+import hashlib
 import numpy as np
 import pandas as pd
 from typing import Any, Dict, List, Optional, Union
-from sklearn.ensemble import IsolationForest
-from sklearn.neighbors import LocalOutlierFactor
-from statsmodels.tsa.seasonal import seasonal_decompose
 from agentflow.transformations.advanced_strategies import AdvancedTransformationStrategy
 
+# Anomaly detection results keyed by (strategy, params, data fingerprint);
+# the oldest entry is evicted once the cache is full
+_ESTIMATOR_CACHE: Dict[tuple, tuple] = {}
+_ESTIMATOR_CACHE_SIZE = 32
+
 class TimeSeriesTransformationStrategy(AdvancedTransformationStrategy):
     """Strategy for time series transformations."""
     
@@ -43,6 +46,9 @@ class TimeSeriesTransformationStrategy(AdvancedTransformationStrategy):
         result['original'] = series  # Always include original series
         
         if self.strategy == 'decomposition':
+            # statsmodels is only imported when a decomposition is requested
+            from statsmodels.tsa.seasonal import seasonal_decompose
+            
             period = self.params.get('period', 7)
             decomposition = seasonal_decompose(series, period=period)
             result['trend'] = decomposition.trend
@@ -86,6 +92,15 @@ class AnomalyDetectionStrategy(AdvancedTransformationStrategy):
         super().__init__(**kwargs)
         self.strategy = strategy
     
+    @classmethod
+    def clear_cache(cls) -> None:
+        """Drop all cached detection results.
+        
+        Results are shared process-wide, so unseeded detectors return the
+        first fit for identical inputs until the cache is cleared.
+        """
+        _ESTIMATOR_CACHE.clear()
+    
     def transform(self, data: Union[np.ndarray, pd.DataFrame]) -> Union[np.ndarray, pd.DataFrame]:
         """Detect anomalies in data.
         
@@ -102,12 +117,57 @@ class AnomalyDetectionStrategy(AdvancedTransformationStrategy):
         else:
             data_array = data
         
+        scores, anomaly_scores = self._detect(np.ascontiguousarray(data_array))
+        
+        # Add anomaly column to output
+        if isinstance(data, pd.DataFrame):
+            result = data.copy()
+            result['predictions'] = scores
+            result['anomalies'] = scores == -1  # True for anomalies (-1), False for normal points (1)
+            result['anomaly_scores'] = anomaly_scores
+            return result
+        else:
+            return np.column_stack([data_array, scores, scores == -1, anomaly_scores])
+    
+    def _detect(self, data_array: np.ndarray):
+        """Return (predictions, anomaly scores), reusing results for identical inputs."""
+        if data_array.dtype.hasobject:
+            # Object arrays hash by pointer, not value
+            return self._fit_detector(data_array)
+        try:
+            key = (
+                self.strategy,
+                tuple(sorted(self.params.items())),
+                data_array.shape,
+                data_array.dtype.str,
+                # Hash the contiguous buffer in place instead of copying it
+                hashlib.blake2b(memoryview(data_array), digest_size=16).digest()
+            )
+            cached = _ESTIMATOR_CACHE.get(key)
+        except (TypeError, ValueError):
+            # Unhashable parameters or a dtype without buffer support, skip caching
+            return self._fit_detector(data_array)
+        
+        if cached is None:
+            cached = self._fit_detector(data_array)
+            if len(_ESTIMATOR_CACHE) >= _ESTIMATOR_CACHE_SIZE:
+                _ESTIMATOR_CACHE.pop(next(iter(_ESTIMATOR_CACHE)))
+            _ESTIMATOR_CACHE[key] = cached
+        return cached
+    
+    def _fit_detector(self, data_array: np.ndarray):
+        """Fit the configured detector and score every sample."""
+        # sklearn estimators are imported on first use to keep module import cheap
         if self.strategy == 'isolation_forest':
+            from sklearn.ensemble import IsolationForest
+            
             detector = IsolationForest(**self.params)
             scores = detector.fit_predict(data_array)
             anomaly_scores = detector.score_samples(data_array)  # Get anomaly scores
             
         elif self.strategy == 'local_outlier_factor':
+            from sklearn.neighbors import LocalOutlierFactor
+            
             detector = LocalOutlierFactor(**self.params)
             scores = detector.fit_predict(data_array)
             anomaly_scores = detector.negative_outlier_factor_  # Get anomaly scores
@@ -120,6 +180,9 @@ class AnomalyDetectionStrategy(AdvancedTransformationStrategy):
             anomaly_scores = -np.max(z_scores, axis=1)  # Use negative max z-score as anomaly score
             
         elif self.strategy == 'ensemble':
+            from sklearn.ensemble import IsolationForest
+            from sklearn.neighbors import LocalOutlierFactor
+            
             # Combine multiple detectors
             iforest = IsolationForest(**self.params)
             lof = LocalOutlierFactor(**self.params)
@@ -138,12 +201,4 @@ class AnomalyDetectionStrategy(AdvancedTransformationStrategy):
         else:
             raise ValueError(f"Unknown anomaly detection strategy: {self.strategy}")
         
-        # Add anomaly column to output
-        if isinstance(data, pd.DataFrame):
-            result = data.copy()
-            result['predictions'] = scores
-            result['anomalies'] = scores == -1  # True for anomalies (-1), False for normal points (1)
-            result['anomaly_scores'] = anomaly_scores
-            return result
-        else:
-            return np.column_stack([data_array, scores, scores == -1, anomaly_scores])
+        return scores, anomaly_scores
@@ -21,15 +21,18 @@ def get_order_arrival_date(order_id: str):
 
 
 
+# Seeds the persistent message history in the main loop below
+SYSTEM_PROMPT = ell2a.system("You are a chatbot mimicing the popstar limbo. She is an alien cat girl from outerspace that writes in all lwoer case kawaii!  You interact with all her fans and can help them do various things and are always game to hangout and just chat..")
+
+
 @ell2a.complex(model="gpt-4o", temperature=0.1, tools=[order_t_shirt, get_order_arrival_date])
 def limbo_chat_bot(message_history: List[Message]) -> List[Message]:
-    return [
-        ell2a.system("You are a chatbot mimicing the popstar limbo. She is an alien cat girl from outerspace that writes in all lwoer case kawaii!  You interact with all her fans and can help them do various things and are always game to hangout and just chat.."),
-    ] + message_history
+    # message_history already starts with SYSTEM_PROMPT
+    return message_history
 
 
 if __name__ == "__main__":
-    message_history = []
+    message_history = [SYSTEM_PROMPT]
 
     while True:
         user_message = input("You: ")
@@ -1,3 +1,4 @@
+from functools import lru_cache
 from typing import List
 import cv2
 import time
@@ -8,25 +9,36 @@ from ell2a.util.plot_ascii import plot_ascii
 
 ell2a.init(verbose=True, store='./logdir', autocommit=True)
 
+# Frames sent together in one request, captured this many seconds apart
+FRAMES_PER_REQUEST = 4
+FRAME_INTERVAL = 0.25
+
 @ell2a.simple(model="gpt-4o", temperature=0.1)
-def describe_activity(image: Image.Image):
+def describe_activity(images: List[Image.Image]):
     return [
         ell2a.system("You are VisionGPT. Answer <5 words all lower case."),
-        ell2a.user(["Describe what the person in the image is doing:", ImageContent(image=image, detail="low")])
+        ell2a.user([
+            "Describe what the person in these consecutive frames is doing:",
+            *[ImageContent(image=image, detail="low") for image in images]
+        ])
     ]
 
 
-def capture_webcam_image():
+@lru_cache(maxsize=1)
+def get_webcam():
+    # Open the device once; reopening it costs far more than a frame grab
     cap = cv2.VideoCapture(0)
-    for _ in range(10):
-        ret, frame = cap.read()
-    ret, frame = cap.read()
-    
-    cap.release()
+    # Keep only the newest frame so a single read is never stale
+    cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+    return cap
+
+
+def capture_webcam_image():
+    ret, frame = get_webcam().read()
     if ret:
-        image = Image.fromarray(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
-        # Resize the image to a smaller 16:9 size, e.g., 160x90
-        return image.resize((160, 90), Image.LANCZOS)
+        # Resize the frame to a smaller 16:9 size, e.g., 160x90
+        frame = cv2.resize(frame, (160, 90), interpolation=cv2.INTER_AREA)
+        return Image.fromarray(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
     return None
 
 if __name__ == "__main__":
@@ -34,13 +46,20 @@ if __name__ == "__main__":
     print("Press Ctrl+C to stop the program.")
     try:
         while True:
-            image = capture_webcam_image()
-            if image:
-                description = describe_activity(image)
+            # One request per batch of frames amortizes the round trip
+            frames = []
+            for _ in range(FRAMES_PER_REQUEST):
+                image = capture_webcam_image()
+                if image:
+                    frames.append(image)
+                time.sleep(FRAME_INTERVAL)
+            if frames:
+                description = describe_activity(frames)
                 print(f"Activity: {description}")
             else:
                 print("Failed to capture image from webcam.")
-            time.sleep(1)
     except KeyboardInterrupt:
         print("Program stopped by user.")
+    finally:
+        get_webcam().release()
 
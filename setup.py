@@ -1,10 +1,36 @@
 """Setup configuration for AgentFlow package."""
 
+import importlib.util
+import os
+import sys
+
 from setuptools import setup, find_packages
 
 with open("README.md", "r", encoding="utf-8") as fh:
     long_description = fh.read()
 
+
+def data_kernel_extensions():
+    """Return the AOT-compiled data kernels when numba is available.
+
+    pip builds in an isolated environment without numba, so this is empty
+    unless numba is installed and ``--no-build-isolation`` is used.
+    """
+    try:
+        import numba.pycc  # noqa: F401
+    except ImportError:
+        return []
+    # Load under the full dotted name so the extension is built into
+    # agentflow.core.instructions rather than as a top-level module
+    name = "agentflow.core.instructions._data_kernels"
+    path = os.path.join("agentflow", "core", "instructions", "_data_kernels.py")
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return [module.build().distutils_extension()]
+
+
 setup(
     name="agentflow",
     version="0.1.0",
@@ -15,6 +41,7 @@ setup(
     long_description_content_type="text/markdown",
     url="https://github.com/agentflow/agentflow",
     packages=find_packages(),
+    ext_modules=data_kernel_extensions(),
     classifiers=[
         "Development Status :: 3 - Alpha",
         "Intended Audience :: Developers",
@@ -47,6 +74,10 @@ setup(
             "mypy",
             "pylint",
             "pytest-cov",
+            "pytest-xdist",
+        ],
+        "performance": [
+            "numba>=0.57.0",
         ],
         "docs": [
             "sphinx",
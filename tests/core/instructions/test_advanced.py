@@ -2,7 +2,7 @@
 import pytest
 import pandas as pd
 import numpy as np
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Callable
 from agentflow.core.instructions.advanced import (
     AdvancedInstruction,
     CompositeInstruction,
@@ -14,12 +14,26 @@ from agentflow.core.instructions.advanced import (
 )
 from agentflow.core.instructions.base import InstructionStatus, InstructionResult, InstructionMetrics, BaseInstruction, ValidationResult
 import asyncio
+import inspect
+import sys
 import time
 import logging
+from types import MappingProxyType
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
+# asyncio.TaskGroup and ExceptionGroup arrived in Python 3.11
+_HAS_TASK_GROUP = sys.version_info >= (3, 11)
+
+# Shared result for validations that pass; never mutated
+VALIDATION_PASSED = ValidationResult(
+    is_valid=True,
+    score=1.0,
+    metrics={},
+    violations=[]
+)
+
 # Test implementations
 class SimpleInstruction(AdvancedInstruction):
     """Simple test instruction implementation."""
@@ -34,27 +48,30 @@ class SimpleInstruction(AdvancedInstruction):
     
     async def _validate(self, context: Dict[str, Any]) -> ValidationResult:
         """Validate context against rules"""
-        for rule in self.validation_rules:
-            try:
-                if not await rule(context):
-                    return ValidationResult(
-                        is_valid=False,
-                        score=0.0,
-                        metrics={},
-                        violations=[f"Failed validation rule"]
-                    )
-            except Exception as e:
-                return ValidationResult(
-                    is_valid=False,
-                    score=0.0,
-                    metrics={},
-                    violations=[f"Error in validation: {str(e)}"]
-                )
+        if not self.validation_rules:
+            return VALIDATION_PASSED
+        
+        try:
+            for rule in self.validation_rules:
+                # Sync rules are not awaited; anything returning an awaitable
+                # (coroutine functions, lambdas, partials) is
+                passed = rule(context)
+                if inspect.isawaitable(passed):
+                    passed = await passed
+                if not passed:
+                    return self._failed_validation("Failed validation rule")
+        except Exception as e:
+            return self._failed_validation(f"Error in validation: {str(e)}")
+        return VALIDATION_PASSED
+    
+    @staticmethod
+    def _failed_validation(violation: str) -> ValidationResult:
+        """Build a failed validation result."""
         return ValidationResult(
-            is_valid=True,
-            score=1.0,
+            is_valid=False,
+            score=0.0,
             metrics={},
-            violations=[]
+            violations=[violation]
         )
     
     async def _execute_impl(self, context: Dict[str, Any]) -> Dict[str, Any]:
@@ -98,23 +115,31 @@ class SimpleParallelInstruction(ParallelInstruction):
     
     async def _execute_impl(self, context: Dict[str, Any]) -> Dict[str, Any]:
         """Execute all instructions in parallel."""
-        tasks = [instruction.execute(context) for instruction in self.instructions[:2]]  # Limit to first 2 instructions
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-        
-        # Separate successful and failed results
-        successful_results = []
-        failed_results = []
-        for r in results:
-            if isinstance(r, InstructionResult):
-                successful_results.append(r.data)
-            else:
-                failed_results.append(str(r))
-        
-        # If there are failed results, raise an exception
-        if failed_results:
-            raise Exception("One or more instructions failed: " + ", ".join(failed_results))
-        
-        result_data = {"results": successful_results}
+        instructions = self.instructions[:2]  # Limit to first 2 instructions
+        
+        if not _HAS_TASK_GROUP:
+            results = await asyncio.gather(
+                *(instruction.execute(context) for instruction in instructions),
+                return_exceptions=True
+            )
+            failed_results = [str(r) for r in results if not isinstance(r, InstructionResult)]
+            if failed_results:
+                raise Exception("One or more instructions failed: " + ", ".join(failed_results))
+            return {"results": [r.data for r in results]}
+        
+        tasks: List[Optional[asyncio.Task]] = [None] * len(instructions)
+        
+        try:
+            async with asyncio.TaskGroup() as tg:
+                for i, instruction in enumerate(instructions):
+                    tasks[i] = tg.create_task(instruction.execute(context))
+        except ExceptionGroup as eg:
+            # If there are failed results, raise an exception
+            raise Exception(
+                "One or more instructions failed: " + ", ".join(str(e) for e in eg.exceptions)
+            )
+        
+        result_data = {"results": [task.result().data for task in tasks]}
         
         return result_data
 
@@ -144,17 +169,24 @@ class ConditionalInstructionTest(ConditionalInstruction):
     
     def __init__(self, name: str, description: str):
         super().__init__(name, description)
-        self.conditions = []
+        # Parallel lists instead of (condition, instruction) tuples
+        self._condition_fns: List[Callable] = []
+        self._condition_instrs: List[BaseInstruction] = []
     
     def add_condition(self, condition: callable, instruction: BaseInstruction):
         """Add a condition and its corresponding instruction."""
-        self.conditions.append((condition, instruction))
+        self._condition_fns.append(condition)
+        self._condition_instrs.append(instruction)
     
     async def _execute_impl(self, context: Dict[str, Any]) -> Dict[str, Any]:
         """Execute the first matching condition's instruction."""
-        for condition, instruction in self.conditions:
-            if await condition(context):
-                result = await instruction.execute(context)
+        for i, condition in enumerate(self._condition_fns):
+            # Await only results that need it, whatever kind of callable produced them
+            matched = condition(context)
+            if inspect.isawaitable(matched):
+                matched = await matched
+            if matched:
+                result = await self._condition_instrs[i].execute(context)
                 return {"result": result.data}
         
         # If no conditions match, raise a ValueError
@@ -180,27 +212,25 @@ def sample_context():
         "state": "ready"
     }
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def sample_data():
     """Create sample data for testing."""
-    np.random.seed(42)
+    rng = np.random.default_rng(42)
     n_samples = 100
-    data = {
-        'feature1': np.random.normal(0, 1, n_samples),
-        'feature2': np.random.normal(0, 1, n_samples),
-        'feature3': np.random.normal(0, 1, n_samples)
-    }
-    return pd.DataFrame(data)
+    return pd.DataFrame({
+        column: rng.standard_normal(n_samples, dtype=np.float32)
+        for column in ("feature1", "feature2", "feature3")
+    })
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def data_context(sample_data):
     """Create sample context with data."""
-    return {
+    return MappingProxyType({
         "data": sample_data,
         "variables": {"threshold": 0.8},
         "resources": {"memory": 1024, "cpu": 4},
         "state": "ready"
-    }
+    })
 
 @pytest.mark.asyncio
 class TestAdvancedInstruction:
@@ -234,6 +264,14 @@ class TestAdvancedInstruction:
         # Test validation
         context = {"test": "value"}
         assert await instr._validate(context)
+        
+        # A plain callable that returns a coroutine is still awaited
+        async def reject(ctx):
+            return False
+        
+        instr.add_validation_rule(lambda ctx: reject(ctx))
+        result = await instr._validate(context)
+        assert not result.is_valid
             
     async def test_execution(self, sample_params, sample_context):
         """Test instruction execution."""
@@ -360,6 +398,15 @@ class TestConditionalInstruction:
         result = await instr.execute(sample_context)
         assert result.status == InstructionStatus.FAILED
         assert "No matching condition" in result.error
+        
+        # A sync wrapper around an async condition is awaited, not taken as truthy
+        instr = ConditionalInstructionTest(
+            name="conditional",
+            description="Conditional instruction"
+        )
+        instr.add_condition(lambda ctx: false_condition(ctx), then_instr)
+        result = await instr.execute(sample_context)
+        assert result.status == InstructionStatus.FAILED
 
 @pytest.mark.asyncio
 class TestParallelInstruction:
@@ -485,6 +532,7 @@ class TestDataProcessingInstruction:
         assert instr.scaler is not None
         assert instr.pca is not None
         assert instr.clusterer is not None
+        assert instr.cluster_centers_ is None
     
     async def test_preprocessing(self, sample_data):
         """Test data preprocessing."""
@@ -493,7 +541,7 @@ class TestDataProcessingInstruction:
             description="Test data processing"
         )
         
-        result = await instr._preprocess(sample_data)
+        result = instr._preprocess(sample_data)
         assert isinstance(result, pd.DataFrame)
         assert result.shape == sample_data.shape
     
@@ -504,8 +552,8 @@ class TestDataProcessingInstruction:
             description="Test data processing"
         )
         
-        processed_data = await instr._preprocess(sample_data)
-        result = await instr._reduce_dimensions(processed_data)
+        processed_data = instr._preprocess(sample_data)
+        result = instr._reduce_dimensions(processed_data)
         assert isinstance(result, pd.DataFrame)
         assert result.shape[0] == sample_data.shape[0]
     
@@ -516,13 +564,16 @@ class TestDataProcessingInstruction:
             description="Test data processing"
         )
         
-        processed_data = await instr._preprocess(sample_data)
-        reduced_data = await instr._reduce_dimensions(processed_data)
-        result = await instr._cluster(reduced_data)
+        processed_data = instr._preprocess(sample_data)
+        reduced_data = instr._reduce_dimensions(processed_data)
+        result = instr._cluster(reduced_data)
         
         assert isinstance(result, np.ndarray)
         assert len(result) == len(sample_data)
         assert all(isinstance(x, (int, np.integer)) for x in result)
+        assert instr.cluster_centers_.shape == (
+            instr.clusterer.n_clusters, reduced_data.shape[1]
+        )
     
     async def test_execution(self, data_context):
         """Test full execution pipeline."""
@@ -540,6 +591,42 @@ class TestDataProcessingInstruction:
         assert isinstance(result.data["metrics"], dict)
         assert all(k in result.data["metrics"] for k in ["n_samples", "n_features", "n_components", "explained_variance"])
     
+    async def test_fused_execution(self, data_context):
+        """Test that the fused pipeline matches the staged one."""
+        fused = DataProcessingInstruction(
+            name="fused",
+            description="Fused data processing"
+        )
+        fused.fuse_stages = True
+        staged = DataProcessingInstruction(
+            name="staged",
+            description="Staged data processing"
+        )
+        assert not staged.fuse_stages
+        
+        fused_result = await fused.execute(data_context)
+        staged_result = await staged.execute(data_context)
+        
+        assert fused_result.status == InstructionStatus.COMPLETED
+        assert staged_result.status == InstructionStatus.COMPLETED
+        assert fused_result.data["processed_data"] is None
+        assert isinstance(staged_result.data["processed_data"], pd.DataFrame)
+        assert fused_result.data["reduced_data"].shape == staged_result.data["reduced_data"].shape
+        np.testing.assert_allclose(
+            fused_result.data["metrics"]["explained_variance"],
+            staged_result.data["metrics"]["explained_variance"],
+            rtol=1e-4
+        )
+        
+        # Cluster ids may be permuted between the two paths
+        fused_labels = fused_result.data["clusters"]
+        staged_labels = staged_result.data["clusters"]
+        agreement = max(
+            np.mean(fused_labels == staged_labels),
+            np.mean(fused_labels == 1 - staged_labels)
+        )
+        assert agreement >= 0.95
+    
     async def test_error_handling(self):
         """Test error handling with invalid input."""
         instr = DataProcessingInstruction(
@@ -1,9 +1,6 @@
 import unittest
-import json
-import os
-import tempfile
-import logging
-from typing import Dict, Any, Union, Optional
+import pytest
+from typing import Dict, Any, Union
 
 import pandas as pd
 import numpy as np
@@ -20,102 +17,129 @@ from agentflow.agents.agent_types import AgentConfig, AgentType, AgentMode
 from agentflow.core.config import ModelConfig
 from agentflow.core.workflow_types import WorkflowConfig
 
-class TestAgentConfiguration(unittest.TestCase):
-    """Test cases for agent configuration and initialization."""
-
-    def setUp(self):
-        """Set up test cases."""
-        # Define agent classes
-        class ResearchAgent(Agent):
-            def __init__(self, config: Union[Dict[str, Any], str, AgentConfig]):
-                super().__init__(config)
-                self.research_domains = self.domain_config.get("research_domains", [])
+class ResearchAgent(Agent):
+    def __init__(self, config: Union[Dict[str, Any], str, AgentConfig]):
+        super().__init__(config)
+        self.research_domains = self.domain_config.get("research_domains", [])
 
-            def process(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
-                return {"result": "research_processed"}
+    def process(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
+        return {"result": "research_processed"}
 
-        class DataScienceAgent(Agent):
-            def __init__(self, config: Union[Dict[str, Any], str, AgentConfig]):
-                super().__init__(config)
-                self.metrics = self.domain_config.get("metrics", [])
-                self.model_type = self.domain_config.get("model_type")
+class DataScienceAgent(Agent):
+    def __init__(self, config: Union[Dict[str, Any], str, AgentConfig]):
+        super().__init__(config)
+        self.metrics = self.domain_config.get("metrics", [])
+        self.model_type = self.domain_config.get("model_type")
 
-            def process(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
-                return {"result": "data_science_processed"}
+    def process(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
+        return {"result": "data_science_processed"}
 
-        # Register agent types
-        AgentFactory.register_agent(AgentType.RESEARCH.value, ResearchAgent)
-        AgentFactory.register_agent(AgentType.DATA_SCIENCE.value, DataScienceAgent)
+@pytest.mark.usefixtures("nltk_resources")
+class TestAgentConfiguration(unittest.TestCase):
+    """Test cases for agent configuration and initialization."""
 
-        # Set up configurations
-        self.research_config = {
-            "AGENT": {
-                "type": AgentType.RESEARCH.value,
-                "name": "QuantumResearchAgent",
-                "mode": AgentMode.SEQUENTIAL.value,
-                "version": "1.0.0"
-            },
-            "MODEL": {
-                "provider": "openai",
-                "name": "gpt-4",
-                "temperature": 0.7
-            },
-            "WORKFLOW": {
-                "name": "research_workflow",
-                "max_iterations": 10,
-                "timeout": 300,
-                "steps": []
-            },
-            "TRANSFORMATIONS": {
-                "input": [
-                    {
-                        "type": "outlier_removal",
-                        "params": {
-                            "method": "z_score",
-                            "threshold": 3.0
-                        }
+    # Configurations are shared read-only across tests
+    research_config = {
+        "AGENT": {
+            "type": AgentType.RESEARCH.value,
+            "name": "QuantumResearchAgent",
+            "mode": AgentMode.SEQUENTIAL.value,
+            "version": "1.0.0"
+        },
+        "MODEL": {
+            "provider": "openai",
+            "name": "gpt-4",
+            "temperature": 0.7
+        },
+        "WORKFLOW": {
+            "name": "research_workflow",
+            "max_iterations": 10,
+            "timeout": 300,
+            "steps": []
+        },
+        "TRANSFORMATIONS": {
+            "input": [
+                {
+                    "type": "outlier_removal",
+                    "params": {
+                        "method": "z_score",
+                        "threshold": 3.0
                     }
-                ]
-            },
-            "DOMAIN_CONFIG": {
-                "research_domains": ["quantum computing"]
-            }
+                }
+            ]
+        },
+        "DOMAIN_CONFIG": {
+            "research_domains": ["quantum computing"]
         }
+    }
 
-        self.data_science_config = {
-            "AGENT": {
-                "type": AgentType.DATA_SCIENCE.value,
-                "name": "FinancialDataAgent",
-                "mode": AgentMode.SEQUENTIAL.value,
-                "version": "1.0.0"
-            },
-            "MODEL": {
-                "provider": "openai",
-                "name": "gpt-4",
-                "temperature": 0.7
-            },
-            "WORKFLOW": {
-                "name": "data_science_workflow",
-                "max_iterations": 10,
-                "timeout": 300,
-                "steps": []
-            },
-            "TRANSFORMATIONS": {
-                "input": [
-                    {
-                        "type": "feature_engineering",
-                        "params": {
-                            "strategy": "polynomial",
-                            "degree": 2
-                        }
+    data_science_config = {
+        "AGENT": {
+            "type": AgentType.DATA_SCIENCE.value,
+            "name": "FinancialDataAgent",
+            "mode": AgentMode.SEQUENTIAL.value,
+            "version": "1.0.0"
+        },
+        "MODEL": {
+            "provider": "openai",
+            "name": "gpt-4",
+            "temperature": 0.7
+        },
+        "WORKFLOW": {
+            "name": "data_science_workflow",
+            "max_iterations": 10,
+            "timeout": 300,
+            "steps": []
+        },
+        "TRANSFORMATIONS": {
+            "input": [
+                {
+                    "type": "feature_engineering",
+                    "params": {
+                        "strategy": "polynomial",
+                        "degree": 2
                     }
-                ]
-            },
-            "DOMAIN_CONFIG": {
-                "metrics": ["r2_score", "mse"],
-                "model_type": "regression"
-            }
+                }
+            ]
+        },
+        "DOMAIN_CONFIG": {
+            "metrics": ["r2_score", "mse"],
+            "model_type": "regression"
+        }
+    }
+
+    custom_config = {
+        "AGENT": {
+            "type": AgentType.CUSTOM.value,
+            "name": "CustomTestAgent",
+            "mode": AgentMode.SEQUENTIAL.value,
+            "version": "1.0.0"
+        },
+        "MODEL": {
+            "provider": "openai",
+            "name": "gpt-4",
+            "temperature": 0.7
+        },
+        "WORKFLOW": {
+            "name": "custom_workflow",
+            "max_iterations": 10,
+            "timeout": 300,
+            "steps": []
         }
+    }
+
+    @classmethod
+    def setUpClass(cls):
+        """Register agent types once for the whole suite."""
+        AgentFactory.register_agent(AgentType.RESEARCH.value, ResearchAgent)
+        AgentFactory.register_agent(AgentType.DATA_SCIENCE.value, DataScienceAgent)
+
+    @classmethod
+    def tearDownClass(cls):
+        """Remove registrations from the process-wide factory registry."""
+        AgentFactory.unregister_agent(AgentType.RESEARCH.value)
+        AgentFactory.unregister_agent(AgentType.DATA_SCIENCE.value)
+        AgentFactory.unregister_agent(AgentType.CUSTOM.value)
 
     def test_research_agent_configuration(self):
         """Test research agent configuration and initialization."""
@@ -153,29 +177,8 @@ class TestAgentConfiguration(unittest.TestCase):
 
         AgentFactory.register_agent(AgentType.CUSTOM.value, CustomAgent)
 
-        # Create a configuration for the custom agent
-        custom_config = {
-            "AGENT": {
-                "type": AgentType.CUSTOM.value,
-                "name": "CustomTestAgent",
-                "mode": AgentMode.SEQUENTIAL.value,
-                "version": "1.0.0"
-            },
-            "MODEL": {
-                "provider": "openai",
-                "name": "gpt-4",
-                "temperature": 0.7
-            },
-            "WORKFLOW": {
-                "name": "custom_workflow",
-                "max_iterations": 10,
-                "timeout": 300,
-                "steps": []
-            }
-        }
-
         # Create custom agent
-        custom_agent = AgentFactory.create_agent(custom_config)
+        custom_agent = AgentFactory.create_agent(self.custom_config)
 
         # Verify agent configuration and functionality
         self.assertEqual(custom_agent.name, "CustomTestAgent")
@@ -187,6 +190,99 @@ class TestAgentConfiguration(unittest.TestCase):
         result = custom_agent.process({"input": "test"})
         self.assertEqual(result, {"result": "custom_processed"})
 
+    def test_agent_factory_reuses_agents(self):
+        """Test that identical configurations share a cached agent when asked to."""
+        AgentFactory.clear_cache()
+
+        first = AgentFactory.create_agent(self.research_config, reuse=True)
+        second = AgentFactory.create_agent(self.research_config, reuse=True)
+        self.assertIs(first, second)
+
+        # Reuse is opt-in; the default builds a fresh agent
+        self.assertIsNot(first, AgentFactory.create_agent(self.research_config))
+
+        other = AgentFactory.create_agent(self.data_science_config, reuse=True)
+        self.assertIsNot(first, other)
+
+        AgentFactory.clear_cache()
+        self.assertIsNot(first, AgentFactory.create_agent(self.research_config, reuse=True))
+        AgentFactory.clear_cache()
+
+    def test_agent_factory_caches_agent_config_inputs(self):
+        """Test cache keys and eviction for AgentConfig inputs."""
+        class ProbeAgent:
+            def __init__(self, config):
+                self.config = config
+
+        AgentFactory.clear_cache()
+        try:
+            # Defaulted ids differ per instance but must not split the cache
+            first = AgentFactory._instantiate(
+                ProbeAgent, AgentConfig(type=AgentType.RESEARCH, name="Probe"), True
+            )
+            second = AgentFactory._instantiate(
+                ProbeAgent, AgentConfig(type=AgentType.RESEARCH, name="Probe"), True
+            )
+            self.assertIs(first, second)
+            self.assertEqual(len(AgentFactory._agent_cache), 1)
+
+            # Explicit ids are part of the key
+            explicit = AgentFactory._instantiate(
+                ProbeAgent, AgentConfig(id="fixed", type=AgentType.RESEARCH, name="Probe"), True
+            )
+            self.assertIsNot(first, explicit)
+
+            # The cache stays bounded, evicting the least recently used entry
+            for i in range(AgentFactory.agent_cache_size + 1):
+                AgentFactory._instantiate(
+                    ProbeAgent, AgentConfig(type=AgentType.RESEARCH, name=f"Probe{i}"), True
+                )
+            self.assertEqual(len(AgentFactory._agent_cache), AgentFactory.agent_cache_size)
+        finally:
+            AgentFactory.clear_cache()
+
+    def test_agent_factory_json_round_trip(self):
+        """Test that a factory holding agents survives to_json/from_json."""
+        agent = Agent(
+            config={"name": "RoundTripAgent", "type": "research", "system_prompt": "Be brief."},
+            name="RoundTripAgent",
+            metadata={"owner": "tests"}
+        )
+        factory = AgentFactory(name="round_trip", agents={agent.id: agent}, metadata={"env": "test"})
+
+        restored = AgentFactory.from_json(factory.to_json())
+
+        self.assertEqual(restored.id, factory.id)
+        self.assertEqual(restored.name, "round_trip")
+        self.assertEqual(restored.metadata, {"env": "test"})
+        self.assertEqual(restored.list_agents(), [agent.id])
+
+        restored_agent = restored.get_agent(agent.id)
+        self.assertIsInstance(restored_agent, Agent)
+        self.assertEqual(restored_agent.id, agent.id)
+        self.assertEqual(restored_agent.name, "RoundTripAgent")
+        self.assertEqual(restored_agent.type, agent.type)
+        self.assertEqual(restored_agent.metadata, {"owner": "tests"})
+        self.assertEqual(restored_agent.config.system_prompt, "Be brief.")
+        self.assertEqual(restored.to_dict(), factory.to_dict())
+
+    def test_agent_factory_from_dict_validates_fields(self):
+        """Test that from_dict rejects malformed fields unless validation is off."""
+        for bad in ({"name": 123}, {"metadata": []}, {"agents": []}):
+            with self.subTest(data=bad):
+                with self.assertRaises(ValueError):
+                    AgentFactory.from_dict(bad)
+
+        # Validation is skipped on request and the data is taken as given
+        unchecked = AgentFactory.from_dict({"name": 123, "metadata": ["raw"]}, validate=False)
+        self.assertEqual(unchecked.name, 123)
+        self.assertEqual(unchecked.metadata, ["raw"])
+
+        loaded = AgentFactory.from_dict({"id": "fixed", "name": "trusted"}, validate=False)
+        self.assertEqual(loaded.id, "fixed")
+        self.assertEqual(loaded.name, "trusted")
+        self.assertEqual(loaded.agents, {})
+
     def test_transformation_pipeline(self):
         """Test transformation pipeline configuration and execution."""
         # Create a sample transformation pipeline
@@ -208,7 +304,7 @@ class TestAgentConfiguration(unittest.TestCase):
         sample_data = pd.DataFrame({
             'A': [1, 2, 100, 4, 5],
             'B': ['hello world', 'test data', 'another example', 'text processing', 'nlp']
-        })
+        }).astype({'A': np.int16, 'B': 'category'})
 
         # Transform data
         transformed_data = pipeline.transform(sample_data)
@@ -216,6 +312,9 @@ class TestAgentConfiguration(unittest.TestCase):
         # Verify transformation results
         self.assertIsInstance(transformed_data, pd.DataFrame)
         self.assertTrue(transformed_data.shape[1] > sample_data.shape[1])
+        # The categorical text column must reach the text strategy
+        self.assertIn('B_word_count', transformed_data.columns)
+        self.assertEqual(transformed_data['B_word_count'].tolist(), [2, 2, 2, 2, 1])
 
 if __name__ == '__main__':
     unittest.main()
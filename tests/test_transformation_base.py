@@ -0,0 +1,53 @@
+import dataclasses
+import sys
+
+import pytest
+
+from agentflow.transformations.base import TransformationResult, TransformationStrategy
+
+class EchoStrategy(TransformationStrategy):
+    __slots__ = ()
+
+    def transform(self, data, context=None):
+        return TransformationResult(success=True, data={"data": data})
+
+def test_identity_matches_attributes():
+    """Test that identity() agrees with the individual getters."""
+    strategy = EchoStrategy({"name": "echo", "description": "Echo input", "version": "2.0.0"})
+
+    assert strategy.identity() == ("echo", "Echo input", "2.0.0")
+    assert strategy.identity() == (
+        strategy.get_name(), strategy.get_description(), strategy.get_version()
+    )
+
+def test_identity_tracks_assignment():
+    """Test that identity() reflects attributes changed after construction."""
+    strategy = EchoStrategy({})
+    assert strategy.identity() == ("EchoStrategy", "", "1.0.0")
+
+    strategy.name = "renamed"
+    strategy.version = "1.1.0"
+    assert strategy.identity() == ("renamed", "", "1.1.0")
+
+def test_strategy_uses_slots():
+    """Test that strategies reject attributes outside their slots."""
+    strategy = EchoStrategy({})
+    with pytest.raises(AttributeError):
+        strategy.extra = "value"
+
+def test_transformation_result_is_frozen():
+    """Test that results cannot be modified after creation."""
+    result = EchoStrategy({}).transform([1, 2, 3])
+
+    assert result.success
+    assert result.data == {"data": [1, 2, 3]}
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        result.success = False
+
+@pytest.mark.skipif(sys.version_info < (3, 10), reason="dataclass slots need Python 3.10")
+def test_transformation_result_uses_slots():
+    """Test that results carry no per-instance __dict__."""
+    result = TransformationResult(success=False, error="failed")
+
+    assert not hasattr(result, "__dict__")
+    assert result.error == "failed"
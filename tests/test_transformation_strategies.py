@@ -1,7 +1,12 @@
-import unittest
+import io
+import logging
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
 import numpy as np
 import pandas as pd
-import logging
 
 from agentflow.transformations.advanced_strategies import (
     OutlierRemovalStrategy,
@@ -13,211 +18,326 @@ from agentflow.transformations.specialized_strategies import (
     AnomalyDetectionStrategy
 )
 
-class TestTransformationStrategies(unittest.TestCase):
-    def setUp(self):
-        """Set up logging and test data."""
-        logging.basicConfig(level=logging.INFO)
-        self.logger = logging.getLogger(self.__class__.__name__)
-        
-        # Numeric test data
-        self.numeric_data = pd.DataFrame({
-            'A': [1, 2, 3, 100, 4, 5, 6],
-            'B': [10, 20, 30, 400, 50, 60, 70]
-        })
-        
-        # Time series test data
-        self.time_series_data = pd.DataFrame({
-            'value': np.random.randn(100).cumsum(),
-            'timestamp': pd.date_range(start='2023-01-01', periods=100)
-        }).set_index('timestamp')
-        
-        # Text test data
-        self.text_data = [
-            "Natural language processing is fascinating",
-            "Machine learning transforms data"
-        ]
-    
-    def test_outlier_removal_strategies(self):
-        """Test different outlier removal strategies."""
-        strategies = [
-            ('z_score', 2.0),
-            ('iqr', 1.5),
-            ('modified_z_score', 3.0)
-        ]
-        
-        for method, threshold in strategies:
-            with self.subTest(method=method):
-                strategy = OutlierRemovalStrategy(method=method, threshold=threshold)
-                cleaned_data = strategy.transform(self.numeric_data)
-                
-                self.assertIsInstance(cleaned_data, pd.DataFrame)
-                self.assertLess(len(cleaned_data), len(self.numeric_data))
-                
-                # Verify no extreme values remain
-                for column in cleaned_data.columns:
-                    self.assertFalse(any(np.abs(cleaned_data[column]) > 100))
-    
-    def test_feature_engineering_strategies(self):
-        """Test various feature engineering strategies."""
-        strategies = [
-            ('polynomial', {'degree': 2}),
-            ('standard', {'with_mean': True, 'with_std': True})
-        ]
-    
-        for strategy, params in strategies:
-            with self.subTest(strategy=strategy):
-                feature_engineer = FeatureEngineeringStrategy(
-                    strategy=strategy,
-                    **params
-                )
-                engineered_features = feature_engineer.transform(self.numeric_data)
-                
-                self.assertIsNotNone(engineered_features)
-                if strategy == 'polynomial':
-                    # For polynomial features, we should have more columns than original
-                    self.assertTrue(engineered_features.shape[1] > self.numeric_data.shape[1])
-                elif strategy == 'standard':
-                    # For standardization, we should have same number of columns
-                    self.assertEqual(engineered_features.shape[1], self.numeric_data.shape[1])
-    
-    def test_text_transformation_strategies(self):
-        """Test text transformation techniques."""
-        # Convert text data to DataFrame
-        text_df = pd.DataFrame({
-            'text': self.text_data
-        })
-        
-        method = 'normalize'  # Only supported method
-        params = {
-            'remove_stopwords': True,
-            'lemmatize': True,
-            'vectorize': True,
-            'max_features': 10
-        }
-        
-        text_transformer = TextTransformationStrategy(
-            method=method,
-            **params
-        )
-        transformed_text = text_transformer.transform(text_df)
-        
-        self.assertIsNotNone(transformed_text)
-        self.assertIsInstance(transformed_text, pd.DataFrame)
-        self.assertTrue('text_word_count' in transformed_text.columns)
-        # Check for TF-IDF features if vectorization is enabled
-        if params['vectorize']:
-            tfidf_cols = [col for col in transformed_text.columns if 'tfidf' in col]
-            # Since we have a small text dataset, we expect fewer features than max_features
-            self.assertLessEqual(len(tfidf_cols), params['max_features'])
-    
-    def test_time_series_transformation(self):
-        """Test time series transformation techniques."""
-        strategies = [
-            ('decomposition', {'period': 7}),
-            ('rolling_features', {'window': 14}),
-            ('lag_features', {'lags': [1, 7, 14]}),
-            ('difference', {'order': 1})
-        ]
-        
-        for strategy, params in strategies:
-            with self.subTest(strategy=strategy):
-                time_series_transformer = TimeSeriesTransformationStrategy(
-                    strategy=strategy, 
-                    **params
-                )
-                transformed_data = time_series_transformer.transform(self.time_series_data)
-                
-                self.assertIsInstance(transformed_data, pd.DataFrame)
-                self.assertGreater(transformed_data.shape[1], 1)
-    
-    def test_anomaly_detection_strategies(self):
-        """Test anomaly detection techniques."""
-        strategies = [
-            ('isolation_forest', {'contamination': 0.1}),
-            ('local_outlier_factor', {'contamination': 0.1}),
-            ('statistical', {}),
-            ('ensemble', {'contamination': 0.1})
-        ]
-    
-        # Create test data with some anomalies
-        anomaly_data = np.random.randn(100, 3)
-        anomaly_data[10:15] *= 10  # Introduce some anomalies
-    
-        for strategy, params in strategies:
-            with self.subTest(strategy=strategy):
-                anomaly_detector = AnomalyDetectionStrategy(
-                    strategy=strategy,
-                    **params
-                )
-                anomaly_results = anomaly_detector.transform(anomaly_data)
-    
-                self.assertIsNotNone(anomaly_results)
-    
-                # Verify anomaly columns are added (predictions, anomalies, anomaly_scores)
-                if isinstance(anomaly_results, np.ndarray):
-                    self.assertEqual(anomaly_results.shape[1], anomaly_data.shape[1] + 3)
-                else:
-                    self.assertTrue('predictions' in anomaly_results.columns)
-                    self.assertTrue('anomalies' in anomaly_results.columns)
-                    self.assertTrue('anomaly_scores' in anomaly_results.columns)
-    
-    def test_transformation_pipeline_integration(self):
-        """Test integration of multiple transformation strategies."""
-        from agentflow.agents.agent import TransformationPipeline
-        
-        # Create a transformation pipeline
-        pipeline = TransformationPipeline()
-        
-        # Add strategies
-        pipeline.add_strategy(
-            OutlierRemovalStrategy(method='z_score', threshold=2.0)
-        )
-        pipeline.add_strategy(
-            FeatureEngineeringStrategy(strategy='polynomial', degree=2)
-        )
-        
-        # Apply transformation
-        transformed_data = pipeline.fit_transform(self.numeric_data)
-        
-        self.assertIsInstance(transformed_data, pd.DataFrame)
-        self.assertGreater(transformed_data.shape[1], self.numeric_data.shape[1])
-    
-    def test_error_handling(self):
-        """Test error handling in transformation strategies."""
-        # Test with invalid input
-        with self.assertRaises(ValueError):
-            strategy = OutlierRemovalStrategy(method='invalid_method')
-            strategy.transform(self.numeric_data)
-        
-        with self.assertRaises(ValueError):
-            strategy = FeatureEngineeringStrategy(strategy='invalid_strategy')
-            strategy.transform(self.numeric_data)
-    
-    def test_logging_and_monitoring(self):
-        """Test logging capabilities of transformation strategies."""
-        import io
-        import logging
-        
-        # Capture log output
-        log_capture = io.StringIO()
-        handler = logging.StreamHandler(log_capture)
-        logger = logging.getLogger('test_logger')
-        logger.addHandler(handler)
-        logger.setLevel(logging.INFO)
-        
-        # Create strategy with custom logger
-        strategy = OutlierRemovalStrategy(
-            method='z_score', 
-            threshold=2.0, 
-            logger=logger
-        )
-        
-        # Apply transformation
-        strategy.transform(self.numeric_data)
-        
-        # Check log output
-        log_contents = log_capture.getvalue()
-        self.assertIn("Applying strategy", log_contents)
+logging.basicConfig(level=logging.INFO)
+
+# Strategies never mutate their input, so every fixture below is built once
+# per module and shared read-only across the parametrized cases
+
+# Random inputs come from one seeded generator at import
+_RNG = np.random.default_rng(0)
+_TIME_SERIES = pd.DataFrame({
+    'value': _RNG.standard_normal(100).cumsum(),
+    'timestamp': pd.date_range(start='2023-01-01', periods=100)
+}).set_index('timestamp')
+_ANOMALY_BASE = _RNG.standard_normal((100, 3))
+_ANOMALY_BASE[10:15] *= 10  # Introduce some anomalies
+
+_TEXT_DATA = [
+    "Natural language processing is fascinating",
+    "Machine learning transforms data"
+]
+_TEXT_TOKENS = [s.lower().split() for s in _TEXT_DATA]
+
+@pytest.fixture(scope="module")
+def numeric_data():
+    """Numeric test data, stored at the narrowest width that holds the values"""
+    return pd.DataFrame({
+        'A': np.array([1, 2, 3, 100, 4, 5, 6], dtype=np.int16),
+        'B': np.array([10, 20, 30, 400, 50, 60, 70], dtype=np.int16)
+    })
+
+@pytest.fixture(scope="module")
+def time_series_data():
+    """Time series test data"""
+    return _TIME_SERIES
+
+@pytest.fixture(scope="module")
+def text_data():
+    """Text test data"""
+    return _TEXT_DATA
+
+@pytest.fixture(scope="module")
+def anomaly_data():
+    """Test data with some anomalies"""
+    return _ANOMALY_BASE
+
+@pytest.fixture(scope="module")
+def outlier_feature_pipeline():
+    """Outlier removal followed by polynomial features, built once per module"""
+    from agentflow.agents.agent import TransformationPipeline
+
+    pipeline = TransformationPipeline()
+    pipeline.add_strategy(
+        OutlierRemovalStrategy(method='z_score', threshold=2.0)
+    )
+    pipeline.add_strategy(
+        FeatureEngineeringStrategy(strategy='polynomial', degree=2)
+    )
+    return pipeline
+
+def test_import_leaves_heavy_dependencies_unloaded():
+    """Test that importing the strategies does not load sklearn or statsmodels."""
+    code = (
+        "import sys\n"
+        "import agentflow.transformations.specialized_strategies\n"
+        "print(sorted(m for m in ('sklearn', 'statsmodels') if m in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=Path(__file__).resolve().parents[1]
+    )
+    assert result.stdout.strip().splitlines()[-1] == "[]"
+
+def test_numeric_data_is_compact(numeric_data):
+    """Test that the shared numeric fixture stays at a narrow dtype."""
+    int64_bytes = numeric_data.astype(np.int64).memory_usage(deep=True).sum()
+    assert numeric_data.memory_usage(deep=True).sum() < int64_bytes
+
+@pytest.mark.parametrize("method,threshold", [
+    ('z_score', 2.0),
+    ('iqr', 1.5),
+    ('modified_z_score', 3.0)
+])
+def test_outlier_removal_strategies(numeric_data, method, threshold):
+    """Test different outlier removal strategies."""
+    strategy = OutlierRemovalStrategy(method=method, threshold=threshold)
+    cleaned_data = strategy.transform(numeric_data)
+
+    assert isinstance(cleaned_data, pd.DataFrame)
+    assert len(cleaned_data) < len(numeric_data)
+
+    # Verify no extreme values remain
+    assert not (np.abs(cleaned_data.to_numpy()) > 100).any()
+
+def test_outlier_removal_nullable_columns(numeric_data):
+    """Test that nullable columns holding pd.NA are handled as NaN."""
+    data = numeric_data.astype("Int64")
+    data.loc[0, 'A'] = pd.NA
+    strategy = OutlierRemovalStrategy(method='z_score', threshold=2.0)
+    cleaned_data = strategy.transform(data)
+
+    assert len(cleaned_data) < len(data)
+    assert 100 not in cleaned_data['A'].tolist()
+
+@pytest.mark.parametrize("strategy,params", [
+    ('polynomial', {'degree': 2}),
+    ('standard', {'with_mean': True, 'with_std': True})
+])
+def test_feature_engineering_strategies(numeric_data, strategy, params):
+    """Test various feature engineering strategies."""
+    feature_engineer = FeatureEngineeringStrategy(
+        strategy=strategy,
+        **params
+    )
+    engineered_features = feature_engineer.transform(numeric_data)
+
+    assert engineered_features is not None
+    if strategy == 'polynomial':
+        # For polynomial features, we should have more columns than original
+        assert engineered_features.shape[1] > numeric_data.shape[1]
+    elif strategy == 'standard':
+        # For standardization, we should have same number of columns
+        assert engineered_features.shape[1] == numeric_data.shape[1]
+        # Scaled values must not be truncated back to the narrow input dtype
+        for col in numeric_data.columns:
+            assert engineered_features[col].dtype == np.float64
+            assert np.isclose(engineered_features[col].mean(), 0.0)
+            assert np.isclose(engineered_features[col].std(ddof=0), 1.0)
+
+@pytest.mark.usefixtures("nltk_resources")
+def test_text_transformation_strategies(text_data):
+    """Test text transformation techniques."""
+    # Convert text data to DataFrame
+    text_df = pd.DataFrame({
+        'text': text_data
+    })
+
+    method = 'normalize'  # Only supported method
+    params = {
+        'remove_stopwords': True,
+        'lemmatize': True,
+        'vectorize': True,
+        'max_features': 10
+    }
+
+    text_transformer = TextTransformationStrategy(
+        method=method,
+        **params
+    )
+    transformed_text = text_transformer.transform(text_df)
+
+    assert transformed_text is not None
+    assert isinstance(transformed_text, pd.DataFrame)
+    assert 'text_word_count' in transformed_text.columns
+    # Check for TF-IDF features if vectorization is enabled
+    if params['vectorize']:
+        tfidf_cols = [col for col in transformed_text.columns if 'tfidf' in col]
+        # Since we have a small text dataset, we expect fewer features than max_features
+        assert len(tfidf_cols) <= params['max_features']
+
+@pytest.mark.usefixtures("nltk_resources")
+def test_text_transformation_from_tokens(text_data):
+    """Test that pre-tokenized input matches the DataFrame text path."""
+    params = {
+        'remove_stopwords': True,
+        'lemmatize': True
+    }
+    text_transformer = TextTransformationStrategy(method='normalize', **params)
+
+    from_tokens = text_transformer.transform(_TEXT_TOKENS)
+    from_text = text_transformer.transform(pd.DataFrame({'text': text_data}))
+
+    assert isinstance(from_tokens, pd.DataFrame)
+    assert from_tokens['text'].tolist() == from_text['text'].tolist()
+    assert from_tokens['text_word_count'].tolist() == from_text['text_word_count'].tolist()
+
+@pytest.mark.parametrize("strategy,params", [
+    ('decomposition', {'period': 7}),
+    ('rolling_features', {'window': 14}),
+    ('lag_features', {'lags': [1, 7, 14]}),
+    ('difference', {'order': 1})
+])
+def test_time_series_transformation(time_series_data, strategy, params):
+    """Test time series transformation techniques."""
+    time_series_transformer = TimeSeriesTransformationStrategy(
+        strategy=strategy,
+        **params
+    )
+    transformed_data = time_series_transformer.transform(time_series_data)
+
+    assert isinstance(transformed_data, pd.DataFrame)
+    assert transformed_data.shape[1] > 1
+
+# Keep the sklearn-heavy detectors on one xdist worker (-n auto --dist=loadgroup)
+@pytest.mark.xdist_group("anomaly_detection")
+@pytest.mark.parametrize("strategy,params", [
+    ('isolation_forest', {'contamination': 0.1}),
+    ('local_outlier_factor', {'contamination': 0.1}),
+    ('statistical', {}),
+    ('ensemble', {'contamination': 0.1})
+])
+def test_anomaly_detection_strategies(anomaly_data, strategy, params):
+    """Test anomaly detection techniques."""
+    anomaly_detector = AnomalyDetectionStrategy(
+        strategy=strategy,
+        **params
+    )
+    anomaly_results = anomaly_detector.transform(anomaly_data)
+
+    assert anomaly_results is not None
+
+    # Verify anomaly columns are added (predictions, anomalies, anomaly_scores)
+    if isinstance(anomaly_results, np.ndarray):
+        assert anomaly_results.shape[1] == anomaly_data.shape[1] + 3
+    else:
+        assert 'predictions' in anomaly_results.columns
+        assert 'anomalies' in anomaly_results.columns
+        assert 'anomaly_scores' in anomaly_results.columns
+
+@pytest.fixture
+def counted_detector(monkeypatch):
+    """Count detector fits and start each test with an empty result cache."""
+    calls = []
+
+    def fit(self, data_array):
+        calls.append(data_array.shape)
+        return np.ones(len(data_array)), np.zeros(len(data_array))
+
+    monkeypatch.setattr(AnomalyDetectionStrategy, "_fit_detector", fit)
+    AnomalyDetectionStrategy.clear_cache()
+    yield calls
+    AnomalyDetectionStrategy.clear_cache()
+
+def test_anomaly_detection_cache_hits_and_misses(anomaly_data, counted_detector):
+    """Test that identical inputs reuse a fit and changed inputs refit."""
+    detector = AnomalyDetectionStrategy(strategy='statistical')
+    detector.transform(anomaly_data)
+    detector.transform(anomaly_data.copy())
+    assert len(counted_detector) == 1
+
+    detector.transform(anomaly_data[:50])
+    AnomalyDetectionStrategy(strategy='statistical', threshold=2).transform(anomaly_data)
+    assert len(counted_detector) == 3
+
+    AnomalyDetectionStrategy.clear_cache()
+    detector.transform(anomaly_data)
+    assert len(counted_detector) == 4
+
+def test_anomaly_detection_cache_evicts_oldest(anomaly_data, counted_detector, monkeypatch):
+    """Test that the cache stays bounded and evicts the oldest entry first."""
+    from agentflow.transformations import specialized_strategies
+
+    monkeypatch.setattr(specialized_strategies, "_ESTIMATOR_CACHE_SIZE", 2)
+    detector = AnomalyDetectionStrategy(strategy='statistical')
+    for rows in (10, 20, 30):
+        detector.transform(anomaly_data[:rows])
+    assert len(specialized_strategies._ESTIMATOR_CACHE) == 2
+
+    detector.transform(anomaly_data[:30])
+    assert len(counted_detector) == 3
+    detector.transform(anomaly_data[:10])
+    assert len(counted_detector) == 4
+
+def test_anomaly_detection_cache_bypass(anomaly_data, counted_detector):
+    """Test that object data and unhashable parameters are never cached."""
+    from agentflow.transformations import specialized_strategies
+
+    objects = anomaly_data.astype(object)
+    detector = AnomalyDetectionStrategy(strategy='statistical')
+    detector.transform(objects)
+    detector.transform(objects)
+
+    unhashable = AnomalyDetectionStrategy(strategy='statistical', weights=[1, 2, 3])
+    unhashable.transform(anomaly_data)
+    unhashable.transform(anomaly_data)
+
+    assert len(counted_detector) == 4
+    assert not specialized_strategies._ESTIMATOR_CACHE
+
+def test_transformation_pipeline_integration(outlier_feature_pipeline, numeric_data):
+    """Test integration of multiple transformation strategies."""
+    # Apply transformation
+    transformed_data = outlier_feature_pipeline.fit_transform(numeric_data)
+
+    assert isinstance(transformed_data, pd.DataFrame)
+    assert transformed_data.shape[1] > numeric_data.shape[1]
+
+def test_error_handling(numeric_data):
+    """Test error handling in transformation strategies."""
+    # Test with invalid input
+    with pytest.raises(ValueError):
+        strategy = OutlierRemovalStrategy(method='invalid_method')
+        strategy.transform(numeric_data)
+
+    with pytest.raises(ValueError):
+        strategy = FeatureEngineeringStrategy(strategy='invalid_strategy')
+        strategy.transform(numeric_data)
+
+def test_logging_and_monitoring(numeric_data):
+    """Test logging capabilities of transformation strategies."""
+    # Capture log output
+    log_capture = io.StringIO()
+    handler = logging.StreamHandler(log_capture)
+    logger = logging.getLogger('test_logger')
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+
+    # Create strategy with custom logger
+    strategy = OutlierRemovalStrategy(
+        method='z_score',
+        threshold=2.0,
+        logger=logger
+    )
+
+    # Apply transformation
+    strategy.transform(numeric_data)
+
+    # Check log output
+    log_contents = log_capture.getvalue()
+    assert "Applying strategy" in log_contents
 
 if __name__ == '__main__':
-    unittest.main()
+    pytest.main([__file__])